@@ -0,0 +1,86 @@
+"""
+In-process caching helpers.
+
+A small, thread-safe LRU cache with an optional per-entry TTL. It is used
+to short-circuit hot lookups (e.g. duplicate URL submissions) before they
+reach the database. Entries are evicted either when the cache grows past
+``maxsize`` or, if a ``ttl`` is given, when they become older than ``ttl``
+seconds.
+"""
+
+import time
+import unittest
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Hashable, Optional, Tuple
+
+
+class LRUCache:
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key: Hashable) -> Any:
+        """Return the cached value or None if missing or expired."""
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at and expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            expires_at = time.monotonic() + self.ttl if self.ttl else 0.0
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
+
+
+class TestLRUCache(unittest.TestCase):
+    def test_get_set(self):
+        cache = LRUCache(maxsize=2)
+        cache.set("a", 1)
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIsNone(cache.get("missing"))
+
+    def test_eviction_order(self):
+        cache = LRUCache(maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")  # refresh "a" so "b" is the oldest entry
+        cache.set("c", 3)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), 1)
+        self.assertEqual(cache.get("c"), 3)
+
+    def test_ttl_expiry(self):
+        cache = LRUCache(maxsize=2, ttl=0.01)
+        cache.set("a", 1)
+        time.sleep(0.02)
+        self.assertIsNone(cache.get("a"))
+
+    def test_invalidate(self):
+        cache = LRUCache(maxsize=2)
+        cache.set("a", 1)
+        cache.invalidate("a")
+        self.assertIsNone(cache.get("a"))
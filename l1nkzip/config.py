@@ -1,3 +1,4 @@
+from dataclasses import make_dataclass
 from typing import Any, Optional
 
 from pydantic_settings import BaseSettings
@@ -20,7 +21,17 @@ class Settings(BaseSettings):
     generator_string: str = "mn6j2c4rv8bpygw95z7hsdaetxuk3fq"
 
 
-settings = Settings()
+# Settings are parsed from the environment once and then frozen into a
+# plain slotted dataclass, so hot-path attribute reads are slot lookups
+# instead of going through Pydantic's model machinery.
+FrozenSettings = make_dataclass(
+    "FrozenSettings",
+    [(name, field.annotation) for name, field in Settings.model_fields.items()],
+    frozen=True,
+    slots=True,
+)
+
+settings = FrozenSettings(**Settings().model_dump())
 
 
 openapi_tags: list[dict[str, Any]] = [
@@ -71,3 +82,6 @@ ponyorm_settings = {
         "sslmode": "disable",
     },
 }
+
+# The bind arguments for the configured database, resolved once.
+ACTIVE_DB_BIND = ponyorm_settings[settings.db_type]
@@ -54,6 +54,10 @@ from l1nkzip.config import settings
 DEFAULT_BLOCK_SIZE = 24
 MIN_LENGTH = 5
 
+# Bit-reversed value of every byte, used to reverse whole blocks a byte at
+# a time instead of shuffling the 24 bits one by one.
+BITREV8 = bytes(int("{:08b}".format(i)[::-1], 2) for i in range(256))
+
 
 class UrlEncoder(object):
     def __init__(
@@ -64,6 +68,11 @@ class UrlEncoder(object):
         self.mask = (1 << block_size) - 1
         self.mapping = list(range(block_size))
         self.mapping.reverse()
+        self._lut = {c: i for i, c in enumerate(alphabet)}
+        self._n = len(alphabet)
+        # The mapping is a plain reversal of the low block_size bits, so
+        # blocks of whole bytes can be reversed through BITREV8.
+        self._whole_bytes = block_size > 0 and block_size % 8 == 0
 
     def encode_url(self, n: int, min_length: int = MIN_LENGTH) -> str:
         return self.enbase(self.encode(n), min_length)
@@ -75,6 +84,8 @@ class UrlEncoder(object):
         return (n & ~self.mask) | self._encode(n & self.mask)
 
     def _encode(self, n: int) -> int:
+        if self._whole_bytes:
+            return self._reverse_block(n)
         result = 0
         for i, b in enumerate(self.mapping):
             if n & (1 << i):
@@ -85,56 +96,52 @@ class UrlEncoder(object):
         return (n & ~self.mask) | self._decode(n & self.mask)
 
     def _decode(self, n: int) -> int:
+        if self._whole_bytes:
+            return self._reverse_block(n)
         result = 0
         for i, b in enumerate(self.mapping):
             if n & (1 << b):
                 result |= 1 << i
         return result
 
+    def _reverse_block(self, n: int) -> int:
+        result = 0
+        for _ in range(self.block_size // 8):
+            result = (result << 8) | BITREV8[n & 0xFF]
+            n >>= 8
+        return result
+
     def enbase(self, x: int, min_length: int = MIN_LENGTH) -> str:
-        result = self._enbase(x)
-        padding = self.alphabet[0] * (min_length - len(result))
-        return "%s%s" % (padding, result)
+        return self._enbase(x).rjust(min_length, self.alphabet[0])
 
     def _enbase(self, x: int) -> str:
         n = len(self.alphabet)
-        if x < n:
-            return self.alphabet[x]
-        return self._enbase(x // n) + self.alphabet[x % n]
+        parts = []
+        while x >= n:
+            x, r = divmod(x, n)
+            parts.append(self.alphabet[r])
+        parts.append(self.alphabet[x])
+        return "".join(reversed(parts))
 
     def debase(self, x: str) -> int:
-        n = len(self.alphabet)
+        lut = self._lut
+        n = self._n
         result = 0
-        for i, c in enumerate(reversed(x)):
-            result += self.alphabet.index(c) * (n**i)
+        for c in x:
+            result = result * n + lut[c]
         return result
 
 
 DEFAULT_ENCODER = UrlEncoder()
 
-
-def encode(n: int) -> int:
-    return DEFAULT_ENCODER.encode(n)
-
-
-def decode(n: int) -> int:
-    return DEFAULT_ENCODER.decode(n)
-
-
-def enbase(n: int, min_length: int = MIN_LENGTH):
-    return DEFAULT_ENCODER.enbase(n, min_length)
-
-
-def debase(n: str) -> int:
-    return DEFAULT_ENCODER.debase(n)
-
-
-def encode_url(n: int, min_length: int = MIN_LENGTH) -> str:
-    return DEFAULT_ENCODER.encode_url(n, min_length)
-
-
-def decode_url(n: str) -> int:
-    return DEFAULT_ENCODER.decode_url(n)
+# Bound methods of the default encoder, exported directly so callers skip
+# the module-global plus descriptor lookup on every call.
+encode = DEFAULT_ENCODER.encode
+decode = DEFAULT_ENCODER.decode
+enbase = DEFAULT_ENCODER.enbase
+debase = DEFAULT_ENCODER.debase
+encode_url = DEFAULT_ENCODER.encode_url
+decode_url = DEFAULT_ENCODER.decode_url
 
 
 class TestGenerator(unittest.TestCase):
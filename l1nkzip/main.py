@@ -1,39 +1,61 @@
+import asyncio
+from collections import defaultdict
 from pathlib import Path
-from typing import List
+from threading import Lock
+from typing import DefaultDict, List, Optional
 
-from fastapi import FastAPI, HTTPException, Request, responses, status
+from fastapi import FastAPI, HTTPException, responses, status
 from fastapi.templating import Jinja2Templates
 
-from l1nkzip.config import openapi_tags, ponyorm_settings, settings
+from l1nkzip.cache import LRUCache
+from l1nkzip.config import ACTIVE_DB_BIND, openapi_tags, settings
+from l1nkzip.generator import MIN_LENGTH, enbase
 from l1nkzip.models import (
     GenericInfo,
     LinkInfo,
     Url,
+    add_visits,
     db,
+    get_link,
     get_visits,
     insert_link,
-    set_visit,
 )
 from l1nkzip.phishtank import (
     PhishTank,
     delete_old_phishes,
     get_phish,
+    refresh_phish_filter,
     update_phishtanks,
 )
 from l1nkzip.version import VERSION_NUMBER
 
+try:
+    import uvloop
+
+    uvloop.install()
+except ImportError:  # pragma: no cover - optional speedup
+    pass
+
 
 @db.on_connect(provider="sqlite")
 def sqlite_litestream(db, connection):
     cursor = connection.cursor()
     cursor.execute("PRAGMA busy_timeout = 5000;")
+    cursor.execute("PRAGMA journal_mode = WAL;")
     cursor.execute("PRAGMA synchronous = NORMAL;")
     cursor.execute("PRAGMA wal_autocheckpoint = 0;")
+    cursor.execute("PRAGMA temp_store = MEMORY;")
+    # 64 MiB page cache and 256 MiB mmap keep redirect reads off the disk.
+    cursor.execute("PRAGMA cache_size = -65536;")
+    cursor.execute("PRAGMA mmap_size = 268435456;")
 
 
-db.bind(**ponyorm_settings[settings.db_type])
+db.bind(**ACTIVE_DB_BIND)
 db.generate_mapping(create_tables=True)
 
+if settings.phishtank:
+    refresh_phish_filter()
+
 
 app = FastAPI(
     title=settings.api_name,
@@ -46,44 +68,109 @@ app = FastAPI(
     },
     redoc_url=None,
     openapi_tags=openapi_tags,
+    default_response_class=responses.ORJSONResponse,
 )
 
 BASE_PATH = Path(__file__).resolve().parent
 templates = Jinja2Templates(directory=f"{BASE_PATH}/templates")
 
+# The 404 page only depends on startup configuration, so it is rendered
+# once instead of going through Jinja on every scanner hit.
+NOT_FOUND_BODY = (
+    templates.get_template("404.html")
+    .render(homepage=settings.site_url, api_name=settings.api_name)
+    .encode()
+)
+
+# Configuration is frozen after startup; handlers read these module-level
+# bindings instead of doing an attribute lookup per request.
+API_TOKEN = settings.token
+PHISHTANK_ENABLED = settings.phishtank
+SITE_URL = settings.site_url
+
+# Short links can only contain characters from the generator alphabet, so
+# scanner noise is rejected with two C-level string checks before any
+# cache or database lookup. The longest possible link is whatever a
+# maximal 32-bit id encodes to.
+LINK_CHARS = frozenset(settings.generator_string)
+MAX_LINK_LENGTH = len(enbase((1 << 32) - 1))
+
+# These redirects never change, so the same response objects are reused
+# across requests instead of rebuilding status line and headers each time.
+REDIRECT_404 = responses.RedirectResponse("/404")
+REDIRECT_ROOT = (
+    responses.RedirectResponse(SITE_URL, status_code=status.HTTP_301_MOVED_PERMANENTLY)
+    if SITE_URL
+    else REDIRECT_404
+)
+
+# Dedupe repeated submissions of the same URL in memory before hitting
+# the database. The TTL keeps the returned visit counters from going
+# stale for too long.
+url_cache = LRUCache(maxsize=10000, ttl=300)
+
+# Hot links are redirected from memory; the database only sees the visit
+# counter increment. Entries hold (url, phish_detail_url or None) so a
+# hit resolves the phishing verdict too. The short TTL bounds staleness
+# after an entry or the PhishTank feed changes.
+link_cache = LRUCache(maxsize=10000, ttl=60)
+
+# Visit increments for cached redirects are coalesced here and flushed in
+# one transaction, so a burst on a viral link issues a single
+# "visits = visits + N" per flush instead of one write-locked UPDATE per
+# request.
+VISIT_FLUSH_INTERVAL = 0.05
+visit_buffer: DefaultDict[str, int] = defaultdict(int)
+visit_buffer_lock = Lock()
+_visit_flusher: Optional[asyncio.Task] = None
+
+
+def flush_visits() -> None:
+    with visit_buffer_lock:
+        counts = dict(visit_buffer)
+        visit_buffer.clear()
+    if counts:
+        add_visits(counts)
+
+
+async def _visit_flusher_loop() -> None:
+    while True:
+        await asyncio.sleep(VISIT_FLUSH_INTERVAL)
+        await asyncio.to_thread(flush_visits)
+
+
+def count_visit(link: str) -> None:
+    global _visit_flusher
+    with visit_buffer_lock:
+        visit_buffer[link] += 1
+    if _visit_flusher is None or _visit_flusher.done():
+        _visit_flusher = asyncio.get_running_loop().create_task(_visit_flusher_loop())
+
+
+@app.on_event("shutdown")
+async def flush_pending_visits() -> None:
+    if _visit_flusher is not None:
+        _visit_flusher.cancel()
+    await asyncio.to_thread(flush_visits)
+
 
 @app.get("/", include_in_schema=False)
 async def root() -> responses.RedirectResponse:
-    redirect: responses.RedirectResponse
-    if settings.site_url:
-        redirect = responses.RedirectResponse(
-            settings.site_url, status_code=status.HTTP_301_MOVED_PERMANENTLY
-        )
-    else:
-        redirect = responses.RedirectResponse("/404")
-    return redirect
+    return REDIRECT_ROOT
 
 
 @app.get("/404", response_class=responses.HTMLResponse, include_in_schema=False)
-async def not_found(request: Request):
-    return templates.TemplateResponse(
-        "404.html",
-        {
-            "request": request,
-            "homepage": settings.site_url,
-            "api_name": settings.api_name,
-        },
-        status_code=404,
-    )
+async def not_found():
+    return responses.HTMLResponse(NOT_FOUND_BODY, status_code=404)
 
 
 @app.get("/phishtank/update/{token}", tags=["phishtank"])
 async def update_phishtank(token: str, cleanup_days: int = 5) -> GenericInfo:
     """Webhook to update the PhishTank database. The database can clean X days older entries."""
-    if token != settings.token:
+    if token != API_TOKEN:
         raise HTTPException(status_code=401, detail="Unauthorized")
     else:
-        if not settings.phishtank:
+        if not PHISHTANK_ENABLED:
             raise HTTPException(status_code=501, detail="PhishTank is not implemented")
         await update_phishtanks()
         deleted_phishes = delete_old_phishes(days=cleanup_days)
@@ -93,54 +180,75 @@ async def update_phishtank(token: str, cleanup_days: int = 5) -> GenericInfo:
 
 
 @app.get("/list/{token}", tags=["urls"])
-def get_list(token: str, limit: int = 100) -> List[LinkInfo]:
+async def get_list(token: str, limit: int = 100) -> List[LinkInfo]:
     """Get a list of all the URLs shortened by this API."""
-    if token != settings.token:
+    if token != API_TOKEN:
         raise HTTPException(status_code=401, detail="Unauthorized")
     else:
-        return get_visits(limit=limit)
+        return await asyncio.to_thread(get_visits, limit=limit)
 
 
 @app.get("/{link}", tags=["urls"])
-def get_url(link: str) -> responses.RedirectResponse:
+async def get_url(link: str) -> responses.RedirectResponse:
     """Redirect to the full URL. If the URL is a phishing URL, it will be redirected to the PhishTank page."""
     redirect: responses.RedirectResponse
-    phish = False
-    link_data = set_visit(link)
+    if not MIN_LENGTH <= len(link) <= MAX_LINK_LENGTH or not LINK_CHARS.issuperset(
+        link
+    ):
+        return REDIRECT_404
+    url = None
+    phish_detail = None
+    entry = link_cache.get(link)
+    if entry is None:
+        link_data = await asyncio.to_thread(get_link, link)
+        if link_data:
+            url = link_data.url
+            if PHISHTANK_ENABLED:
+                phish = await asyncio.to_thread(get_phish, url)
+                if isinstance(phish, PhishTank):
+                    phish_detail = phish.phish_detail_url
+            link_cache.set(link, (url, phish_detail))
+    else:
+        url, phish_detail = entry
 
-    if settings.phishtank and link_data:
-        phish = get_phish(Url(url=link_data.url))
+    if url:
+        count_visit(link)
 
-    if isinstance(phish, PhishTank):
+    if phish_detail:
         redirect = responses.RedirectResponse(
-            phish.phish_detail_url, status_code=status.HTTP_307_TEMPORARY_REDIRECT
+            phish_detail, status_code=status.HTTP_307_TEMPORARY_REDIRECT
         )
-    elif link_data:
+    elif url:
         redirect = responses.RedirectResponse(
-            link_data.url, status_code=status.HTTP_301_MOVED_PERMANENTLY
+            url, status_code=status.HTTP_301_MOVED_PERMANENTLY
         )
     else:
-        redirect = responses.RedirectResponse("/404")
+        redirect = REDIRECT_404
 
     return redirect
 
 
 @app.post("/url", tags=["urls"])
-def create_url(url: Url) -> LinkInfo:
+async def create_url(url: Url) -> LinkInfo:
     """Create a short URL.
     If the URL is a phishing URL, it will be rejected.
     If the URL is already in the database, the information about it will be returned.
     """
-    phish = get_phish(url) if settings.phishtank else False
-    if phish:
+    phish = await asyncio.to_thread(get_phish, url) if PHISHTANK_ENABLED else None
+    if phish is not None:
         raise HTTPException(
             status_code=403,
             detail=f"Phishing URLs are Forbidden. More details about the URL: {phish.phish_detail_url}",
         )
-    link_data = insert_link(str(url.url))
-    return LinkInfo(
-        link=link_data.link,
-        full_link=link_data.full_link,
-        url=link_data.url,
-        visits=link_data.visits,
-    )
+    url_str = str(url.url)
+    link_info = url_cache.get(url_str)
+    if link_info is None:
+        link_data = await asyncio.to_thread(insert_link, url_str)
+        link_info = LinkInfo.model_construct(
+            link=link_data.link,
+            full_link=link_data.full_link,
+            url=link_data.url,
+            visits=link_data.visits,
+        )
+        url_cache.set(url_str, link_info)
+    return link_info
@@ -1,6 +1,5 @@
 from datetime import datetime, timezone
-from pathlib import Path
-from typing import List
+from typing import Dict, List
 
 from pony.orm import Database, Optional, PrimaryKey, Required, db_session
 from pydantic import BaseModel, HttpUrl
@@ -16,9 +15,12 @@ class Url(BaseModel):
 
 
 class LinkInfo(BaseModel):
+    # full_link and url are plain strings: they come from the database and
+    # were validated as URLs when the link was created, so re-validating
+    # them on the way out is wasted work.
     link: str
-    full_link: HttpUrl
-    url: HttpUrl
+    full_link: str
+    url: str
     visits: int
 
 
@@ -46,7 +48,7 @@ class Link(db.Entity):  # type: ignore
 
     @property
     def full_link(self) -> str:
-        return str(Path(settings.api_domain, self.link))
+        return f"{settings.api_domain}/{self.link}"
 
 
 class PhishTank(db.Entity):  # type: ignore
@@ -71,21 +73,35 @@ def insert_link(url) -> Link:
 
 
 @db_session
-def set_visit(link) -> Link:
-    link_data = Link.get(link=link)
-    if link_data:
-        link_data.visits += 1
-    return link_data
+def add_visits(counts: Dict[str, int]) -> None:
+    """Apply buffered visit increments in one transaction.
+
+    Used on the cached redirect path, where the destination URL is already
+    known and only the counters have to be touched. Each link gets a single
+    relative UPDATE no matter how many requests were coalesced.
+    """
+    for link, n in counts.items():
+        db.execute("UPDATE links SET visits = visits + $n WHERE link = $link")
+
+
+@db_session
+def get_link(link) -> Link:
+    return Link.get(link=link)
 
 
 @db_session
 def get_visits(limit: int = 100) -> List[LinkInfo]:
+    # A raw projection of the three returned columns skips Pony entity
+    # hydration and the created_at column entirely. model_construct skips
+    # validation; these values were validated when the link was inserted.
+    prefix = settings.api_domain
+    rows = db.select("link, url, visits FROM links LIMIT $limit")
     return [
-        LinkInfo(
-            link=link.link,
-            full_link=link.full_link,
-            url=link.url,
-            visits=link.visits,
+        LinkInfo.model_construct(
+            link=link,
+            full_link=f"{prefix}/{link}",
+            url=url,
+            visits=visits,
         )
-        for link in Link.select()[:limit]
+        for link, url, visits in rows
     ]
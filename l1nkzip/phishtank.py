@@ -1,44 +1,136 @@
+import asyncio
 from datetime import timedelta
+from typing import Optional, Set, Union
 
 import httpx
+import ijson
 from fastapi import HTTPException
+from pony.orm import select
 
 from l1nkzip.config import settings
-from l1nkzip.models import PhishTank, Url, db_session, utcnow_zone_aware
+from l1nkzip.models import PhishTank, Url, db, db_session, utcnow_zone_aware
+
+# One client for all feed downloads, so TCP/TLS setup and DNS lookups are
+# reused between webhook calls instead of being paid per update. Created
+# lazily to bind it to the running event loop.
+_http_client = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    global _http_client
+    if _http_client is None:
+        _http_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(30.0, connect=5.0),
+            limits=httpx.Limits(max_keepalive_connections=5, max_connections=10),
+            follow_redirects=True,
+        )
+    return _http_client
+
+
+# In-memory set of every known phishing URL, rebuilt from the database at
+# startup and after each feed update. Lookups that miss the set never
+# touch the database; the set may briefly contain already-deleted entries,
+# which simply fall through to a database miss.
+phish_filter: Set[str] = set()
+
+
+def refresh_phish_filter() -> None:
+    global phish_filter
+    with db_session:
+        phish_filter = set(select(p.url for p in PhishTank))  # type: ignore
+
+
+UPSERT_CHUNK_SIZE = 5000
+
+
+def upsert_phishes(items: list) -> None:
+    """Insert or refresh feed items in bulk.
+
+    One executemany per 5000-row chunk replaces the per-row get/insert
+    pattern; rows that already exist only get their updated_at bumped.
+    The ON CONFLICT form is understood by SQLite, Postgres and
+    CockroachDB.
+    """
+    with db_session:
+        placeholder = "?" if db.provider.paramstyle == "qmark" else "%s"
+        sql = (
+            "INSERT INTO phishtanks (id, url, phish_detail_url, updated_at) "
+            "VALUES ({0}, {0}, {0}, {0}) "
+            "ON CONFLICT (id) DO UPDATE SET updated_at = excluded.updated_at"
+        ).format(placeholder)
+        now = str(utcnow_zone_aware())
+        rows = [
+            (item["phish_id"], item["url"], item["phish_detail_url"], now)
+            for item in items
+        ]
+        cursor = db.get_connection().cursor()
+        for start in range(0, len(rows), UPSERT_CHUNK_SIZE):
+            cursor.executemany(sql, rows[start : start + UPSERT_CHUNK_SIZE])
+
+
+class _AsyncChunkReader:
+    """Minimal async file-like wrapper that lets ijson consume an
+    httpx byte stream."""
+
+    def __init__(self, chunks):
+        self._chunks = chunks
+
+    async def read(self, size: int = -1) -> bytes:
+        # ijson probes with read(0) to detect bytes vs text; answering it
+        # with a real chunk would lose data.
+        if size == 0:
+            return b""
+        try:
+            return await self._chunks.__anext__()
+        except StopAsyncIteration:
+            return b""
 
 
 async def update_phishtanks():
     phishtank_url = "http://data.phishtank.com/data"
     if isinstance(settings.phishtank, str) and settings.phishtank != "anonymous":
         phishtank_url = f"{phishtank_url}/{settings.phishtank}"
-    async with httpx.AsyncClient() as client:
-        response = await client.get(
-            f"{phishtank_url}/online-valid.json",
-            headers={
-                "User-Agent": f"phishtank/{settings.api_name}",
-                "accept-encoding": "gzip",
-            },
-            follow_redirects=True,
-        )
+    client = get_http_client()
+    async with client.stream(
+        "GET",
+        f"{phishtank_url}/online-valid.json",
+        headers={
+            "User-Agent": f"phishtank/{settings.api_name}",
+            "accept-encoding": "gzip",
+        },
+    ) as response:
         if response.status_code != 200:
-            raise HTTPException(status_code=response.status_code, detail=response.text)
-        else:
-            with db_session:
-                for item in response.json():
-                    phishtank = PhishTank.get(id=item["phish_id"])
-                    if phishtank:
-                        phishtank.updated_at = utcnow_zone_aware()
-                    else:
-                        PhishTank(
-                            id=item["phish_id"],
-                            url=item["url"],
-                            phish_detail_url=item["phish_detail_url"],
-                        )
+            detail = (await response.aread()).decode(errors="replace")
+            raise HTTPException(status_code=response.status_code, detail=detail)
+        # Parse the dump incrementally so memory stays bounded by the
+        # upsert chunk size instead of the whole multi-MB feed, and
+        # database writes overlap with the download.
+        batch = []
+        reader = _AsyncChunkReader(response.aiter_bytes())
+        async for item in ijson.items(reader, "item"):
+            batch.append(item)
+            if len(batch) >= UPSERT_CHUNK_SIZE:
+                await asyncio.to_thread(upsert_phishes, batch)
+                batch = []
+        if batch:
+            await asyncio.to_thread(upsert_phishes, batch)
+    await asyncio.to_thread(refresh_phish_filter)
 
 
 @db_session
-def get_phish(url_info: Url) -> PhishTank:
-    return PhishTank.get(url=str(url_info.url))
+def _get_phish_from_db(url: str) -> Optional[PhishTank]:
+    return PhishTank.get(url=url)
+
+
+def get_phish(url: Union[Url, str]) -> Optional[PhishTank]:
+    if isinstance(url, Url):
+        url = str(url.url)
+    # The filter answers the common not-a-phish case from memory without
+    # even opening a database session; only potential hits (or an empty,
+    # not-yet-loaded filter) reach the database.
+    if phish_filter and url not in phish_filter:
+        return None
+    return _get_phish_from_db(url)
 
 
 @db_session